@@ -0,0 +1,174 @@
+import hashlib
+import os
+
+import numpy as np
+
+from utils.cache import cache_path, slugify
+
+DEFAULT_BATCH_SIZE = 64
+CHINA_ANCHOR = "Made in China"
+
+# Several phrasings per country; each country's prototype is the mean of its phrase vectors.
+COUNTRY_PROTOTYPES = {
+    "China": [CHINA_ANCHOR, "Manufactured in Shenzhen, China", "Produced in a Guangdong factory", "Imported from China"],
+    "Vietnam": ["Made in Vietnam", "Manufactured in Ho Chi Minh City", "Imported from Vietnam"],
+    "India": ["Made in India", "Handcrafted in India", "Manufactured in Tamil Nadu, India"],
+    "Mexico": ["Made in Mexico", "Assembled in a Mexican maquiladora", "Imported from Mexico"],
+    "USA": ["Made in USA", "Manufactured in the United States", "American-made product"],
+    "France": ["Made in France", "Fabriqué en France", "Produced in France"],
+    "Germany": ["Made in Germany", "German engineering, manufactured in Germany"],
+    "Japan": ["Made in Japan", "Manufactured in Japan"],
+    "Taiwan": ["Made in Taiwan", "Manufactured in Taiwan"],
+    "Bangladesh": ["Made in Bangladesh", "Sewn in Bangladesh garment factory"],
+}
+
+
+def _token_lengths(embedder, texts):
+    """Token count per text, falling back to character length without a tokenizer."""
+    tokenizer = getattr(embedder, "tokenizer", None)
+    if tokenizer is None:
+        return [len(text) for text in texts]
+    encoded = tokenizer(texts, add_special_tokens=False, truncation=False)["input_ids"]
+    return [len(ids) for ids in encoded]
+
+
+def encode_batched(embedder, texts, batch_size=DEFAULT_BATCH_SIZE):
+    """Encode texts in length-sorted batches and return normalized rows in input order.
+
+    Sorting by token length keeps similar-sized texts together so each batch
+    pads to a short maximum instead of the longest text in the chunk.
+    """
+    texts = [str(text) for text in texts]
+    if not texts:
+        return np.zeros((0, embedder.get_sentence_embedding_dimension()), dtype=np.float32)
+
+    order = np.argsort(_token_lengths(embedder, texts), kind="stable")
+    embeddings = None
+
+    for start in range(0, len(texts), batch_size):
+        batch_idx = order[start:start + batch_size]
+        batch = embedder.encode(
+            [texts[i] for i in batch_idx],
+            batch_size=len(batch_idx),
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+        if embeddings is None:
+            embeddings = np.empty((len(texts), batch.shape[1]), dtype=np.float32)
+        embeddings[batch_idx] = batch
+
+    return embeddings
+
+
+def encode_cached(embedder, texts, cache, batch_size=DEFAULT_BATCH_SIZE):
+    """Like encode_batched, but only texts missing from the embedding cache hit the encoder.
+
+    Fresh vectors are rounded through float16, the cache's storage type, so a
+    cold run and a warm run of the same texts score (and label) identically.
+    """
+    texts = [str(text) for text in texts]
+    hits, missing = cache.get_many(texts)
+    if not hits:
+        embeddings = encode_batched(embedder, texts, batch_size).astype(np.float16)
+        cache.put_many(texts, embeddings)
+        return embeddings.astype(np.float32)
+
+    dim = len(next(iter(hits.values())))
+    embeddings = np.empty((len(texts), dim), dtype=np.float32)
+    for i, vector in hits.items():
+        embeddings[i] = vector
+    if missing:
+        fresh = encode_batched(embedder, [texts[i] for i in missing], batch_size).astype(np.float16)
+        embeddings[missing] = fresh
+        cache.put_many([texts[i] for i in missing], fresh)
+    return embeddings
+
+
+def origin_labels(china_scores):
+    """made_in_china and tariff_vulnerability label arrays from China similarity scores."""
+    china_scores = np.asarray(china_scores)
+    conditions = [china_scores > 0.6, china_scores > 0.4]
+    made_in_china = np.select(conditions, ["Yes", "Unclear"], default="No")
+    vulnerability = np.select(conditions, ["High", "Medium"], default="Low")
+    return made_in_china, vulnerability
+
+
+def anchor_scores(embeddings, anchor):
+    """Cosine similarity of every (normalized) embedding row against one anchor vector."""
+    anchor = np.asarray(anchor, dtype=np.float32)
+    anchor = anchor / np.linalg.norm(anchor)
+    return embeddings @ anchor
+
+
+class AnchorRegistry:
+    """Reference-phrase embeddings encoded once per model and persisted to disk.
+
+    Vectors are stored in one .npz file per (model, revision) so later runs
+    load them without touching the encoder; revision is the loaded weights'
+    hub commit (utils.models.model_revision), so an updated model re-encodes.
+    """
+
+    def __init__(self, embedder, model_name, revision="main"):
+        self.embedder = embedder
+        self.path = cache_path("anchors", f"{slugify(model_name)}@{slugify(revision)}.npz")
+        self._vectors = {}
+        if self.path.exists():
+            with np.load(self.path) as stored:
+                self._vectors = {key: stored[key] for key in stored.files}
+
+    @staticmethod
+    def _key(phrase):
+        return hashlib.sha1(phrase.encode("utf-8")).hexdigest()
+
+    def get(self, phrase):
+        """Normalized embedding for a single phrase."""
+        return self.get_many([phrase])[0]
+
+    def get_many(self, phrases):
+        """Matrix of normalized embeddings, one row per phrase, encoding only unseen phrases."""
+        keys = [self._key(phrase) for phrase in phrases]
+        missing = [phrase for phrase, key in zip(phrases, keys) if key not in self._vectors]
+        if missing:
+            encoded = self.embedder.encode(missing, convert_to_numpy=True, normalize_embeddings=True)
+            for phrase, vector in zip(missing, encoded):
+                self._vectors[self._key(phrase)] = vector.astype(np.float32)
+            # Write then rename so concurrent worker processes never read a half-written file
+            tmp = self.path.with_name(f"{self.path.stem}.{os.getpid()}.tmp.npz")
+            np.savez(tmp, **self._vectors)
+            os.replace(tmp, self.path)
+        return np.stack([self._vectors[key] for key in keys])
+
+
+class OriginClassifier:
+    """Scores embeddings against a matrix of per-country prototype vectors.
+
+    Each prototype is the renormalized mean of that country's phrase
+    embeddings, so a batch is scored with a single matrix multiply. The
+    prototypes only pick likely_origin; the Yes/Unclear/No thresholds in
+    origin_labels were calibrated against the single CHINA_ANCHOR phrase,
+    so china_scores keeps using that vector.
+    """
+
+    def __init__(self, registry, prototypes=COUNTRY_PROTOTYPES):
+        self.countries = list(prototypes)
+        rows = []
+        for country in self.countries:
+            centroid = registry.get_many(list(prototypes[country])).mean(axis=0)
+            rows.append(centroid / np.linalg.norm(centroid))
+        self.prototypes = np.stack(rows).astype(np.float32)
+        self.china_anchor = registry.get(CHINA_ANCHOR)
+
+    def china_scores(self, embeddings):
+        """Cosine similarity of each normalized embedding row to CHINA_ANCHOR, for origin_labels."""
+        return anchor_scores(np.asarray(embeddings, dtype=np.float32), self.china_anchor)
+
+    def scores(self, embeddings):
+        """(n_texts, n_countries) cosine scores for normalized embedding rows."""
+        return np.asarray(embeddings, dtype=np.float32) @ self.prototypes.T
+
+    def predict(self, embeddings):
+        """Most likely country per row plus the full score matrix."""
+        scores = self.scores(embeddings)
+        best = np.asarray(self.countries, dtype=object)[scores.argmax(axis=1)]
+        return best, scores
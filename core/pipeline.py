@@ -0,0 +1,141 @@
+import queue
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from core.origin_analyzer import AnchorRegistry, OriginClassifier, encode_cached, origin_labels
+from core.sourcing_advisor import build_prompt, suggest_alternatives
+from utils.cache import EmbeddingCache
+from utils.models import configure_threads, load_embedder, model_id, model_revision
+
+# Per-process embedding state, filled by init_embedding_worker
+_worker = {}
+
+_DONE = object()
+
+
+def classify_origin(chunk, embedder, classifier, embedding_cache, batch_size):
+    """Origin columns for one CSV chunk, computed column-wise in one batched pass, plus its embeddings."""
+    titles = chunk['title'].fillna("").astype(str)
+    descriptions = chunk['description'].fillna("").astype(str)
+
+    texts = (titles + ". " + descriptions).tolist()
+    embeddings = encode_cached(embedder, texts, embedding_cache, batch_size)
+    origins, _ = classifier.predict(embeddings)
+    made_in_china, vulnerability = origin_labels(classifier.china_scores(embeddings))
+
+    frame = pd.DataFrame({
+        "title": titles.to_numpy(),
+        "price": chunk['price'].astype(float).to_numpy(),
+        "description": descriptions.to_numpy(),
+        "made_in_china": made_in_china,
+        "tariff_vulnerability": vulnerability,
+        "likely_origin": origins,
+    })
+    if "cost" in chunk.columns:
+        frame["cost"] = chunk["cost"].astype(float).to_numpy()
+    return frame, embeddings
+
+
+def add_suggestions(frame, generator, suggestion_cache, model_name, batch_size, policy=None):
+    """Alternative sourcing column, generating each distinct prompt once.
+
+    Rows rejected by the GenerationPolicy (if any) get a null suggestion
+    without reaching the generator.
+    """
+    suggestions = np.full(len(frame), None, dtype=object)
+    if generator is not None:
+        wanted = np.flatnonzero(policy.mask(frame)) if policy else np.arange(len(frame))
+        titles, descriptions = frame["title"].to_numpy(), frame["description"].to_numpy()
+        prompts = [build_prompt(titles[i], descriptions[i]) for i in wanted]
+        suggestions[wanted] = suggest_alternatives(generator, prompts, suggestion_cache, model_name, batch_size)
+    frame["alt_sourcing"] = suggestions
+    return frame
+
+
+def init_embedding_worker(model_name, device=None, threads=None, backend="torch"):
+    """Load this process's own embedder, classifier and cache connection."""
+    configure_threads(threads)
+    embedder = load_embedder(model_name, device, backend, threads)
+    cache_key, revision = model_id(model_name, backend), model_revision(embedder)
+    _worker.update(
+        embedder=embedder,
+        classifier=OriginClassifier(AnchorRegistry(embedder, cache_key, revision)),
+        embedding_cache=EmbeddingCache(cache_key, revision=revision),
+    )
+
+
+def embed_chunk(chunk, batch_size):
+    """classify_origin with the state loaded by init_embedding_worker (picklable for process pools)."""
+    return classify_origin(chunk, _worker["embedder"], _worker["classifier"], _worker["embedding_cache"], batch_size)
+
+
+def ordered_map(executor, fn, items, window, *args):
+    """Like executor.map, but yields results in input order with at most window tasks in flight."""
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item, *args))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+class _StageError:
+    def __init__(self, error):
+        self.error = error
+
+
+def _drain(inbox):
+    """Items from inbox until the _DONE sentinel (compared by identity; items may be DataFrames)."""
+    while True:
+        item = inbox.get()
+        if item is _DONE:
+            return
+        yield item
+
+
+def _run_stage(fn, inbox, outbox):
+    try:
+        for item in _drain(inbox):
+            if isinstance(item, _StageError):
+                outbox.put(item)
+                return
+            outbox.put(fn(item))
+    except BaseException as error:
+        outbox.put(_StageError(error))
+        return
+    outbox.put(_DONE)
+
+
+def _feed(items, outbox):
+    try:
+        for item in items:
+            outbox.put(item)
+    except BaseException as error:
+        outbox.put(_StageError(error))
+        return
+    outbox.put(_DONE)
+
+
+def staged(items, stages, maxsize=2):
+    """Run items through stage functions, each in its own thread, linked by bounded queues.
+
+    Iterating items (e.g. CSV parsing) also happens on a thread, so every
+    stage works on a different chunk at the same time while the caller
+    consumes finished results in input order. An exception in any stage is
+    re-raised in the caller.
+    """
+    inbox = queue.Queue(maxsize)
+    threading.Thread(target=_feed, args=(items, inbox), daemon=True).start()
+    for fn in stages:
+        outbox = queue.Queue(maxsize)
+        threading.Thread(target=_run_stage, args=(fn, inbox, outbox), daemon=True).start()
+        inbox = outbox
+
+    for item in _drain(inbox):
+        if isinstance(item, _StageError):
+            raise item.error
+        yield item
@@ -0,0 +1,104 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from core.origin_analyzer import COUNTRY_PROTOTYPES
+
+MADE_IN_CHINA = pd.CategoricalDtype(["Yes", "Unclear", "No"])
+TARIFF_VULNERABILITY = pd.CategoricalDtype(["High", "Medium", "Low"], ordered=True)
+LIKELY_ORIGIN = pd.CategoricalDtype(list(COUNTRY_PROTOTYPES))
+
+RESULT_COLUMNS = ["title", "price", "description", "made_in_china", "tariff_vulnerability", "likely_origin", "alt_sourcing"]
+
+# Label columns are small fixed vocabularies, so they are stored as categoricals
+# (integer codes). Text columns use the nullable string dtype so an all-empty
+# alt_sourcing chunk keeps a string type in Parquet. Prices stay full precision
+# on disk and are only downcast when results are read back (READ_DTYPES).
+LABEL_DTYPES = {
+    "made_in_china": MADE_IN_CHINA,
+    "tariff_vulnerability": TARIFF_VULNERABILITY,
+    "likely_origin": LIKELY_ORIGIN,
+}
+RESULT_DTYPES = {
+    "title": "string",
+    "description": "string",
+    "alt_sourcing": "string",
+    **LABEL_DTYPES,
+}
+READ_DTYPES = {**RESULT_DTYPES, "price": "float32", "cost": "float32"}
+
+
+def apply_schema(df):
+    """Cast the known result columns present in df to their storage dtypes."""
+    return df.astype({column: dtype for column, dtype in RESULT_DTYPES.items() if column in df.columns})
+
+
+def _compact(df):
+    """Cast a frame read from disk to READ_DTYPES, warning about labels outside the known vocabularies.
+
+    Casting to a fixed CategoricalDtype turns unknown labels into missing
+    values, which would silently drop those rows from every facet filter.
+    """
+    for column, dtype in LABEL_DTYPES.items():
+        if column not in df.columns:
+            continue
+        values = df[column].astype("category")
+        unknown = sorted(set(values.cat.categories) - set(dtype.categories))
+        if unknown:
+            count = int(values.isin(unknown).sum())
+            warnings.warn(
+                f"{count:,} {column} value(s) outside the known labels were read as missing: "
+                f"{', '.join(map(str, unknown[:5]))}{', ...' if len(unknown) > 5 else ''}"
+            )
+            values = values.cat.remove_categories(unknown)
+        df[column] = values.astype(dtype)
+    return df.astype({column: dtype for column, dtype in READ_DTYPES.items() if column in df.columns and column not in LABEL_DTYPES})
+
+
+def is_parquet(source):
+    """Whether a path or uploaded file object names a Parquet file."""
+    return str(getattr(source, "name", source)).lower().endswith((".parquet", ".pq"))
+
+
+def result_columns(source):
+    """Column names stored in a results file, read from the header or Parquet footer only."""
+    if hasattr(source, "seek"):
+        source.seek(0)
+    if is_parquet(source):
+        import pyarrow.parquet as pq
+
+        return list(pq.read_schema(source).names)
+    return list(pd.read_csv(source, nrows=0).columns)
+
+
+def read_results(source, columns=None, filters=None):
+    """Read a classified results CSV or Parquet file with explicit compact dtypes.
+
+    columns limits which columns are parsed. filters maps column -> required
+    value (e.g. {"tariff_vulnerability": "High"}) for scripted reads; for
+    Parquet they are pushed down as row-group predicates so non-matching row
+    groups are never decoded. Filtered frames get a fresh 0..n-1 index from
+    either format. The dashboard filters through FacetIndex row positions
+    instead, since it keeps every row to switch filters without re-reading.
+    """
+    filters = filters or {}
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+    if is_parquet(source):
+        import pyarrow.parquet as pq
+
+        predicates = [(column, "==", value) for column, value in filters.items()] or None
+        return _compact(pq.read_table(source, columns=columns, filters=predicates).to_pandas())
+
+    usecols = None if columns is None else list(dict.fromkeys([*columns, *filters]))
+    # Labels are parsed as inferred categoricals so _compact can spot unknown values
+    dtypes = {column: "category" if column in LABEL_DTYPES else dtype for column, dtype in READ_DTYPES.items()}
+    df = _compact(pd.read_csv(source, usecols=usecols, dtype=dtypes))
+    if filters:
+        matches = np.ones(len(df), dtype=bool)
+        for column, value in filters.items():
+            matches = matches & (df[column] == value).to_numpy()
+        df = df[matches].reset_index(drop=True)
+    return df if columns is None else df[list(columns)]
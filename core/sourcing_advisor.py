@@ -0,0 +1,100 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from utils.cache import normalize_text
+
+GENERATION_KWARGS = {"max_new_tokens": 100}
+DEFAULT_GEN_BATCH_SIZE = 8
+VULNERABILITY_TIERS = ("High", "Medium", "Low")
+
+
+@dataclass
+class GenerationPolicy:
+    """Decides which classified rows are worth an LLM sourcing suggestion.
+
+    A row qualifies when its tariff_vulnerability is in tiers and, if set,
+    its price is at least min_price and its margin ((price - cost) / price,
+    needs a cost column) is at least min_margin.
+    """
+
+    tiers: tuple = ("High", "Medium")
+    min_price: float = None
+    min_margin: float = None
+
+    def mask(self, frame):
+        """Boolean array, True for rows that should get a generated suggestion."""
+        wanted = frame["tariff_vulnerability"].isin(self.tiers).to_numpy()
+        if self.min_price is not None:
+            wanted = wanted & (frame["price"] >= self.min_price).to_numpy()
+        if self.min_margin is not None:
+            if "cost" not in frame.columns:
+                raise ValueError("min_margin needs a 'cost' column in the input")
+            margin = (frame["price"] - frame["cost"]) / frame["price"]
+            wanted = wanted & (margin >= self.min_margin).fillna(False).to_numpy()
+        return np.asarray(wanted, dtype=bool)
+
+
+def build_prompt(title, description):
+    return f"""Product:
+Title: {title}
+Description: {description}
+
+Suggest 2 countries (not China) that could manufacture this item cost-effectively.
+
+Answer:"""
+
+
+def parse_suggestion(generated_text):
+    return generated_text.split("Answer:")[-1].strip()
+
+
+def prepare_for_batching(generator):
+    """Give the pipeline tokenizer a pad token, left-padding decoder-only models so generation continues the prompt."""
+    tokenizer = getattr(generator, "tokenizer", None)
+    if tokenizer is None:
+        return
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    if not generator.model.config.is_encoder_decoder:
+        tokenizer.padding_side = "left"
+
+
+def generate_batched(generator, prompts, batch_size=DEFAULT_GEN_BATCH_SIZE, **gen_kwargs):
+    """Generated text per prompt, running the pipeline over length-sorted padded batches."""
+    if not prompts:
+        return []
+    prepare_for_batching(generator)
+    order = sorted(range(len(prompts)), key=lambda i: len(prompts[i]))
+    outputs = generator([prompts[i] for i in order], batch_size=batch_size, **gen_kwargs)
+
+    texts = [None] * len(prompts)
+    for i, output in zip(order, outputs):
+        # text-generation yields a list of candidates per prompt, text2text-generation a single dict
+        if isinstance(output, list):
+            output = output[0]
+        texts[i] = output["generated_text"]
+    return texts
+
+
+def suggest_alternatives(generator, prompts, cache=None, model_name="", batch_size=DEFAULT_GEN_BATCH_SIZE, **gen_kwargs):
+    """Sourcing suggestion per prompt, generating each distinct prompt at most once.
+
+    Prompts are deduplicated on their normalized text, a SuggestionCache
+    (if given) is consulted, and only the remaining prompts are generated in
+    batches of batch_size.
+    """
+    gen_kwargs = {**GENERATION_KWARGS, **gen_kwargs}
+    unique = {}
+    for prompt in prompts:
+        unique.setdefault(normalize_text(prompt), prompt)
+
+    answers = cache.get_many(list(unique.values()), model_name, gen_kwargs) if cache else {}
+    todo = [prompt for prompt in unique.values() if prompt not in answers]
+    generated = generate_batched(generator, todo, batch_size, **gen_kwargs)
+    fresh = {prompt: parse_suggestion(text) for prompt, text in zip(todo, generated)}
+    if cache and fresh:
+        cache.put_many(fresh, model_name, gen_kwargs)
+    answers.update(fresh)
+
+    return [answers[unique[normalize_text(prompt)]] for prompt in prompts]
@@ -1,43 +1,38 @@
 import streamlit as st
-import pandas as pd
+
+from ui.dashboard import (
+    column_picker, facet_filters, facet_index, file_digest, filter_rows, lazy_download_button, load_results, paginated_table,
+    semantic_index, similar_products, text_index,
+)
 
 # === Load Data ===
 st.title("TariffHunterGPT Dashboard")
 st.subheader("AI Analysis of Product Tariff Vulnerability")
 
-uploaded_file = st.file_uploader("Upload a classified CSV file", type=["csv"])
+uploaded_file = st.file_uploader("Upload a classified CSV or Parquet file", type=["csv", "parquet"])
 
 if uploaded_file:
-    df = pd.read_csv(uploaded_file)
+    digest = file_digest(uploaded_file)
+    columns = column_picker(digest, uploaded_file)
 
     # Filters
-    col1, col2 = st.columns(2)
-
-    with col1:
-        made_in_china_filter = st.selectbox(
-            "Filter by Made in China:", ["All", "Yes", "No", "Unclear"]
-        )
-
-    with col2:
-        vulnerability_filter = st.selectbox(
-            "Filter by Tariff Vulnerability:", ["All", "High", "Medium", "Low"]
-        )
-
-    filtered_df = df.copy()
+    selections = facet_filters(facet_index(digest, uploaded_file))
+    df = load_results(digest, columns, uploaded_file)
+    rows = filter_rows(digest, selections, uploaded_file)
 
-    if made_in_china_filter != "All":
-        filtered_df = filtered_df[filtered_df["made_in_china"] == made_in_china_filter]
-
-    if vulnerability_filter != "All":
-        filtered_df = filtered_df[filtered_df["tariff_vulnerability"] == vulnerability_filter]
-
-    # Table View
-    st.dataframe(filtered_df)
+    # Table View (one page at a time)
+    paginated_table(df, (digest, columns, selections), rows, load_search_index=lambda: text_index((digest, columns), df))
 
     # Download Button
-    st.download_button(
+    lazy_download_button(
         "📥 Download Filtered Results",
-        data=filtered_df.to_csv(index=False).encode('utf-8'),
+        (digest, columns, selections),
+        df,
         file_name="filtered_products.csv",
-        mime='text/csv'
+        rows=rows,
     )
+
+    # Semantic Search
+    embeddings_file = st.file_uploader("Upload the matching embeddings file to find similar products", type=["npy"])
+    if embeddings_file:
+        similar_products(digest, columns, uploaded_file, semantic_index(file_digest(embeddings_file), embeddings_file))
@@ -1,16 +1,85 @@
+import os
+import time
+
 import streamlit as st
 import pandas as pd
-from sentence_transformers import SentenceTransformer, util
-from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, pipeline
-import torch
 
-# === Load Hugging Face Models ===
-embedder = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2', device='cpu')
+from core.origin_analyzer import AnchorRegistry, OriginClassifier, encode_batched, origin_labels
+from core.schema import apply_schema
+from core.sourcing_advisor import suggest_alternatives
+from ui.dashboard import (
+    column_picker, facet_filters, facet_index, file_digest, filter_rows, lazy_download_button, load_results, paginated_table,
+    text_index,
+)
+from utils.jobs import JobQueue
+from utils.models import load_embedder, model_id, model_revision
 
+# === Load Hugging Face Models (lazily, once per process, shared across reruns and sessions) ===
+# torch/transformers are imported inside the loaders so "Upload CSV" mode never pays for them.
+embedder_name = 'sentence-transformers/all-MiniLM-L6-v2'
+embedder_backend = os.environ.get("TARIFFHUNTER_EMBEDDER_BACKEND", "torch")  # or "onnx" / "onnx-int8"
 model_name = "google/flan-t5-base"
-tokenizer = AutoTokenizer.from_pretrained(model_name)
-model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
-generator = pipeline("text2text-generation", model=model, tokenizer=tokenizer)
+
+
+@st.cache_resource(show_spinner="Loading embedding model...")
+def load_classifier():
+    embedder = load_embedder(embedder_name, device='cpu', backend=embedder_backend)
+    registry = AnchorRegistry(embedder, model_id(embedder_name, embedder_backend), model_revision(embedder))
+    return embedder, OriginClassifier(registry)
+
+
+@st.cache_resource(show_spinner="Loading generation model...")
+def load_generator():
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, pipeline
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+    return pipeline("text2text-generation", model=model, tokenizer=tokenizer)
+
+
+@st.cache_resource
+def job_queue():
+    """Process-wide background worker pool for product analysis jobs."""
+    return JobQueue(max_workers=1)
+
+
+ANALYSIS_BATCH_SIZE = 8
+
+
+def analyze_lines(lines):
+    """Classify and suggest sourcing for one batch of "title - description" lines (runs on a job worker)."""
+    embedder, classifier = load_classifier()
+    generator = load_generator()
+    titles = [line.split(" - ")[0] if " - " in line else line for line in lines]
+
+    # Step 1: Determine if it's made in China
+    texts = [f"{title}. {description}" for title, description in zip(titles, lines)]
+    embeddings = encode_batched(embedder, texts, ANALYSIS_BATCH_SIZE)
+    origins, _ = classifier.predict(embeddings)
+    made_in_china, vulnerability = origin_labels(classifier.china_scores(embeddings))
+
+    # Step 2: Ask AI for sourcing suggestions for the whole batch
+    prompts = [
+        f"Suggest 2 countries (not China) that could manufacture the following product cost-effectively:\n{title}\n{description}"
+        for title, description in zip(titles, lines)
+    ]
+    suggestions = suggest_alternatives(generator, prompts, batch_size=ANALYSIS_BATCH_SIZE)
+
+    return [
+        {
+            "title": title,
+            "description": description,
+            "price": 14.99,  # default placeholder price
+            "made_in_china": made,
+            "tariff_vulnerability": vuln,
+            "likely_origin": origin,
+            "alt_sourcing": alt_sourcing
+        }
+        for title, description, made, vuln, origin, alt_sourcing
+        in zip(titles, lines, made_in_china, vulnerability, origins, suggestions)
+    ]
+
+
 # === Streamlit App ===
 st.title("TariffHunterGPT Dashboard")
 st.subheader("Analyze or Create Product CSVs with AI Assistance")
@@ -18,67 +87,48 @@ st.subheader("Analyze or Create Product CSVs with AI Assistance")
 option = st.radio("Select Mode:", ("Upload CSV", "Type Product Ideas"))
 
 if option == "Upload CSV":
-    uploaded_file = st.file_uploader("Upload a classified CSV file", type=["csv"])
+    uploaded_file = st.file_uploader("Upload a classified CSV or Parquet file", type=["csv", "parquet"])
     if uploaded_file:
-        df = pd.read_csv(uploaded_file)
-
-        col1, col2 = st.columns(2)
-        with col1:
-            made_in_china_filter = st.selectbox("Filter by Made in China:", ["All", "Yes", "No", "Unclear"])
-        with col2:
-            vulnerability_filter = st.selectbox("Filter by Tariff Vulnerability:", ["All", "High", "Medium", "Low"])
+        digest = file_digest(uploaded_file)
+        columns = column_picker(digest, uploaded_file)
 
-        filtered_df = df.copy()
-        if made_in_china_filter != "All":
-            filtered_df = filtered_df[filtered_df["made_in_china"] == made_in_china_filter]
-        if vulnerability_filter != "All":
-            filtered_df = filtered_df[filtered_df["tariff_vulnerability"] == vulnerability_filter]
+        selections = facet_filters(facet_index(digest, uploaded_file))
+        df = load_results(digest, columns, uploaded_file)
+        rows = filter_rows(digest, selections, uploaded_file)
 
-        st.dataframe(filtered_df)
-        st.download_button("Download Filtered Results", filtered_df.to_csv(index=False).encode('utf-8'), file_name="filtered_products.csv", mime='text/csv')
+        paginated_table(df, (digest, columns, selections), rows, load_search_index=lambda: text_index((digest, columns), df))
+        lazy_download_button("Download Filtered Results", (digest, columns, selections), df, file_name="filtered_products.csv", rows=rows)
 
 elif option == "Type Product Ideas":
     product_input = st.text_area("Enter product titles and descriptions (one per line):", height=250)
     process_btn = st.button("Analyze Products with AI")
 
     if process_btn and product_input:
-        st.info("Running AI classification...")
-        lines = product_input.strip().split("\n")
-        results = []
-
-        for line in lines:
-            title = line.strip().split(" - ")[0] if " - " in line else line.strip()
-            description = line.strip()
-            price = 14.99  # default placeholder price
-
-            # Step 1: Determine if it's made in China
-            text = f"{title}. {description}"
-            score = util.cos_sim(embedder.encode("Made in China"), embedder.encode(text)).item()
-
-            if score > 0.6:
-                made_in_china = "Yes"
-                vulnerability = "High"
-            elif 0.4 < score <= 0.6:
-                made_in_china = "Unclear"
-                vulnerability = "Medium"
-            else:
-                made_in_china = "No"
-                vulnerability = "Low"
-
-            # Step 2: Ask AI for sourcing suggestions
-            prompt = f"Suggest 2 countries (not China) that could manufacture the following product cost-effectively:\n{title}\n{description}"
-            alt_sourcing = generator(prompt, max_new_tokens=100)[0]['generated_text'].strip()
-
-            results.append({
-                "title": title,
-                "description": description,
-                "price": price,
-                "made_in_china": made_in_china,
-                "tariff_vulnerability": vulnerability,
-                "alt_sourcing": alt_sourcing
-            })
-
-        df = pd.DataFrame(results)
+        # Load models here so the spinner shows; the job worker then hits the cache
+        load_classifier()
+        load_generator()
+        lines = [line.strip() for line in product_input.strip().split("\n") if line.strip()]
+        st.session_state["analysis_job"] = job_queue().submit(analyze_lines, lines, batch_size=ANALYSIS_BATCH_SIZE)
+
+    job = job_queue().get(st.session_state.get("analysis_job"))
+    if job and job.done and not job.error:
+        # Keep finished results in the session; the job itself is no longer needed
+        st.session_state["analysis_results"] = apply_schema(pd.DataFrame(job.results))
+        del st.session_state["analysis_job"]
+        job = None
+
+    if job:
+        st.progress(job.progress, text=f"Job {job.id}: {len(job.results)} of {job.total} products analyzed")
+        if job.results:
+            st.dataframe(apply_schema(pd.DataFrame(list(job.results))))
+        if job.error:
+            st.error(f"AI analysis failed: {job.error}")
+        else:
+            # Poll for the next finished batch; touching a widget just reruns and picks the job up again
+            time.sleep(1)
+            st.rerun()
+    elif "analysis_results" in st.session_state:
+        df = st.session_state["analysis_results"]
         st.success("AI analysis complete!")
         st.dataframe(df)
         csv = df.to_csv(index=False).encode('utf-8')
@@ -1,56 +1,173 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import islice
+from multiprocessing import get_context
+
 import pandas as pd
-from sentence_transformers import SentenceTransformer, util
-from transformers import pipeline
-
-# === Load Models ===
-embedder = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
-generator = pipeline("text-generation", model="mistralai/Mistral-7B-Instruct-v0.2", device_map="auto")
-
-# === Output List ===
-results = []
-
-# === Stream CSV in Chunks ===
-for chunk in pd.read_csv("products.csv", chunksize=10):
-    for _, row in chunk.iterrows():
-        title = str(row['title'])
-        description = str(row['description'])
-        price = float(row['price'])
-
-        # Classify origin
-        text = f"{title}. {description}"
-        china_score = util.cos_sim(embedder.encode("Made in China"), embedder.encode(text)).item()
-
-        if china_score > 0.6:
-            made_in_china = "Yes"
-            vulnerability = "High"
-        elif 0.4 < china_score <= 0.6:
-            made_in_china = "Unclear"
-            vulnerability = "Medium"
+
+from core.pipeline import add_suggestions, embed_chunk, init_embedding_worker, ordered_map, staged
+from core.schema import apply_schema, is_parquet, result_columns
+from core.sourcing_advisor import VULNERABILITY_TIERS, GenerationPolicy
+from utils.cache import SuggestionCache
+from utils.checkpoint import Checkpoint, checkpoint_path, file_hash
+from utils.models import (
+    DEFAULT_EMBEDDER, DEFAULT_GENERATOR, EMBEDDER_BACKENDS, GENERATOR_BACKENDS,
+    check_parity, configure_threads, load_embedder, load_generator, model_id, onnx_model_dir,
+)
+from utils.writers import NpySink, embeddings_path, open_sink
+
+INPUT_COLUMNS = {"title", "description", "price", "cost"}
+PARITY_MIN_COSINE = 0.99
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Classify products for China-origin tariff exposure.")
+    parser.add_argument("--input", default="products.csv", help="product CSV with title, description, price and optional cost columns")
+    parser.add_argument("--output", default="classified_products.csv", help="results file (.csv or .parquet)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="rows read and written per chunk")
+    parser.add_argument("--batch-size", type=int, default=64, help="texts per embedding batch")
+    parser.add_argument("--gen-batch-size", type=int, default=8, help="prompts per generation batch")
+    parser.add_argument("--embedder", default=DEFAULT_EMBEDDER, help="sentence-transformers model id")
+    parser.add_argument("--embedder-backend", choices=EMBEDDER_BACKENDS, default="torch",
+                        help="torch: sentence-transformers; onnx / onnx-int8: exported ONNX Runtime model on CPU")
+    parser.add_argument("--check-parity", action="store_true",
+                        help="with an ONNX embedder, compare it to torch on a sample of the input before running")
+    parser.add_argument("--generator", default=DEFAULT_GENERATOR, help="text-generation model id (a .gguf path for the gguf backend)")
+    parser.add_argument("--generator-backend", choices=GENERATOR_BACKENDS, default="torch",
+                        help="torch: full precision; int8: dynamically quantized on CPU (loading still peaks at the fp32 "
+                             "size, ~28 GB for a 7B model); gguf: llama.cpp runtime")
+    parser.add_argument("--device", default=None, help="torch device such as 'cpu' or 'cuda:0' (default: auto)")
+    parser.add_argument("--threads", type=int, default=None, help="torch CPU threads")
+    parser.add_argument("--workers", type=int, default=0, help="embedding worker processes (0: embed in the main process)")
+    parser.add_argument("--worker-threads", type=int, default=1, help="torch CPU threads per embedding worker")
+    parser.add_argument("--queue-size", type=int, default=2, help="chunks buffered between pipeline stages")
+    parser.add_argument("--no-embeddings", action="store_true", help="do not save product embeddings next to the output")
+    parser.add_argument("--skip-generation", action="store_true", help="only classify origin; leave alt_sourcing empty")
+    parser.add_argument("--generate-for", default="High,Medium",
+                        help="comma-separated vulnerability tiers that get LLM suggestions, or 'all'")
+    parser.add_argument("--min-price", type=float, default=None, help="only generate suggestions at or above this price")
+    parser.add_argument("--min-margin", type=float, default=None,
+                        help="only generate suggestions at or above this margin, e.g. 0.3 (needs a cost column)")
+    parser.add_argument("--resume", action="store_true", help="skip chunks finished by a previous run and append to its output (CSV output only)")
+    args = parser.parse_args(argv)
+    tiers = VULNERABILITY_TIERS if args.generate_for == "all" else tuple(t.strip() for t in args.generate_for.split(","))
+    unknown = set(tiers) - set(VULNERABILITY_TIERS)
+    if unknown:
+        parser.error(f"unknown vulnerability tier(s) for --generate-for: {', '.join(sorted(unknown))}")
+    if args.resume and is_parquet(args.output):
+        parser.error("--resume needs CSV output; a Parquet file written by an interrupted run cannot be appended to")
+    # Checked against the header now rather than on the first chunk, after the generator has loaded
+    if args.min_margin is not None and "cost" not in result_columns(args.input):
+        parser.error(f"--min-margin needs a 'cost' column, which {args.input} does not have")
+    args.policy = GenerationPolicy(tiers, args.min_price, args.min_margin)
+    return args
+
+
+def run_settings(args):
+    """Options that change the written output, recorded in the checkpoint so --resume can check them."""
+    settings = {
+        "embedder": args.embedder,
+        "embedder_backend": args.embedder_backend,
+        "embeddings": not args.no_embeddings,
+        "skip_generation": args.skip_generation,
+        "generator": None,
+        "generator_backend": None,
+        "policy": None,
+    }
+    if not args.skip_generation:
+        settings.update(
+            generator=args.generator,
+            generator_backend=args.generator_backend,
+            policy={"tiers": list(args.policy.tiers), "min_price": args.policy.min_price, "min_margin": args.policy.min_margin},
+        )
+    return settings
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # === Checkpoint ===
+    input_hash = file_hash(args.input)
+    settings = run_settings(args)
+    checkpoint = Checkpoint.load(checkpoint_path(args.output)) if args.resume else None
+    if checkpoint is None:
+        checkpoint = Checkpoint(str(checkpoint_path(args.output)), input_hash, args.chunk_size, settings=settings)
+        resume_at = None
+    elif checkpoint.input_hash != input_hash or checkpoint.chunk_size != args.chunk_size:
+        raise SystemExit("Checkpoint does not match the current input file or chunk size; rerun without --resume.")
+    elif checkpoint.settings != settings:
+        changed = sorted(key for key in {*checkpoint.settings, *settings} if checkpoint.settings.get(key) != settings.get(key))
+        raise SystemExit(
+            f"Checkpoint was written with different {', '.join(changed)} settings; "
+            "resume with the original options or rerun without --resume."
+        )
+    else:
+        resume_at = checkpoint.output_bytes
+        print(f"Resuming after {checkpoint.rows_done} products ({checkpoint.chunks_done} chunks)")
+
+    # === Load Models ===
+    configure_threads(args.threads)
+    generator = None if args.skip_generation else load_generator(
+        args.generator, args.device, backend=args.generator_backend, threads=args.threads,
+    )
+    # Backends produce different text, so cached suggestions are kept apart per backend
+    generator_id = model_id(args.generator, args.generator_backend)
+
+    if args.embedder_backend != "torch":
+        # Export once here rather than racing in every worker process
+        onnx_model_dir(args.embedder)
+        if args.check_parity:
+            sample = pd.read_csv(args.input, nrows=256, usecols=["title", "description"]).fillna("").astype(str)
+            texts = (sample["title"] + ". " + sample["description"]).tolist()
+            reference = load_embedder(args.embedder, args.device)
+            candidate = load_embedder(args.embedder, backend=args.embedder_backend, threads=args.threads)
+            min_cosine = check_parity(reference, candidate, texts)
+            print(f"Embedder parity ({args.embedder_backend} vs torch): min cosine {min_cosine:.4f} over {len(texts)} texts")
+            if min_cosine < PARITY_MIN_COSINE:
+                raise SystemExit(f"{args.embedder_backend} embeddings diverge from torch (min cosine < {PARITY_MIN_COSINE}).")
+    suggestion_cache = SuggestionCache()
+
+    # === Stream CSV in Chunks, appending each to the output as it completes ===
+    reader = pd.read_csv(args.input, chunksize=args.chunk_size, usecols=lambda column: column in INPUT_COLUMNS)
+    resume_rows = None if resume_at is None else checkpoint.rows_done
+    with ExitStack() as stack:
+        sink = stack.enter_context(open_sink(args.output, resume_at))
+        vector_sink = None if args.no_embeddings else stack.enter_context(NpySink(embeddings_path(args.output), resume_rows))
+        chunks = islice(reader, checkpoint.chunks_done, None)
+
+        def generate(classified):
+            frame, embeddings = classified
+            frame = add_suggestions(frame, generator, suggestion_cache, generator_id, args.gen_batch_size, args.policy)
+            return frame, embeddings
+
+        # Reader -> embedder -> generator threads linked by bounded queues; this thread writes
+        if args.workers:
+            # Each worker process embeds whole chunks with its own model; results come back in input order
+            executor = stack.enter_context(ProcessPoolExecutor(
+                args.workers, mp_context=get_context("spawn"),
+                initializer=init_embedding_worker, initargs=(args.embedder, args.device, args.worker_threads, args.embedder_backend),
+            ))
+            classified = ordered_map(executor, embed_chunk, chunks, 2 * args.workers, args.batch_size)
+            results = staged(classified, [generate], args.queue_size)
         else:
-            made_in_china = "No"
-            vulnerability = "Low"
-
-        # Recommend alternative sourcing countries
-        prompt = f"""Product:
-Title: {title}
-Description: {description}
-
-Suggest 2 countries (not China) that could manufacture this item cost-effectively.
-
-Answer:"""
-        suggestion = generator(prompt, max_new_tokens=100)[0]["generated_text"].split("Answer:")[-1].strip()
-
-        results.append({
-            "title": title,
-            "price": price,
-            "description": description,
-            "made_in_china": made_in_china,
-            "tariff_vulnerability": vulnerability,
-            "alt_sourcing": suggestion
-        })
-
-# === Save to CSV ===
-df = pd.DataFrame(results)
-print(df)
-df.to_csv("classified_products.csv", index=False)
-print("\n✅ Results saved to classified_products.csv")
+            init_embedding_worker(args.embedder, args.device, args.threads, args.embedder_backend)
+            results = staged(chunks, [lambda chunk: embed_chunk(chunk, args.batch_size), generate], args.queue_size)
+
+        for frame, embeddings in results:
+            sink.write(apply_schema(frame))
+            if vector_sink:
+                vector_sink.write(embeddings)
+            checkpoint.chunks_done += 1
+            checkpoint.rows_done += len(frame)
+            checkpoint.output_bytes = sink.bytes_written
+            # A Parquet file is unreadable until closed, so there is nothing to resume from
+            if not is_parquet(args.output):
+                checkpoint.save()
+            print(f"Classified {checkpoint.rows_done} products")
+
+    print(f"\n✅ Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
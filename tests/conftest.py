@@ -0,0 +1,68 @@
+import hashlib
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import utils.cache  # noqa: E402
+
+
+class StubEmbedder:
+    """Deterministic stand-in for a sentence-transformers model (vectors seeded by the text's SHA-1)."""
+
+    tokenizer = None
+
+    def get_sentence_embedding_dimension(self):
+        return 16
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, normalize_embeddings=False, show_progress_bar=False):
+        single = isinstance(sentences, str)
+        rows = []
+        for text in [sentences] if single else sentences:
+            seed = int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:4], "little")
+            rows.append(np.random.default_rng(seed).standard_normal(16).astype(np.float32))
+        embeddings = np.stack(rows)
+        if normalize_embeddings:
+            embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings[0] if single else embeddings
+
+
+class StubGenerator:
+    """Text-generation pipeline stand-in; raises on call number fail_on (1-based) if given."""
+
+    tokenizer = None
+
+    def __init__(self, fail_on=None):
+        self.calls = 0
+        self.fail_on = fail_on
+        self.prompts = []
+
+    def __call__(self, prompts, batch_size=None, **gen_kwargs):
+        self.calls += 1
+        if self.calls == self.fail_on:
+            raise RuntimeError("generator crashed")
+        self.prompts.extend(prompts)
+        return [[{"generated_text": f"{prompt} Vietnam, India"}] for prompt in prompts]
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Keep every test's embedding/anchor/suggestion caches in its own temporary directory."""
+    monkeypatch.setattr(utils.cache, "CACHE_DIR", tmp_path / "cache")
+    return tmp_path / "cache"
+
+
+@pytest.fixture
+def products_csv(tmp_path):
+    """Small product CSV, including rows with a missing description."""
+    rows = [
+        {"title": f"Product {i}", "description": None if i % 7 == 0 else f"Steel gadget model {i}", "price": 5.0 + i}
+        for i in range(23)
+    ]
+    path = tmp_path / "products.csv"
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return path
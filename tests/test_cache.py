@@ -0,0 +1,68 @@
+import itertools
+from types import SimpleNamespace
+
+import pytest
+
+import utils.cache
+from conftest import StubGenerator
+from core.sourcing_advisor import suggest_alternatives
+from utils.cache import SuggestionCache
+
+PARAMS = {"max_new_tokens": 10}
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """SuggestionCache on a fake clock that advances one second per call, so LRU order is deterministic."""
+    clock = itertools.count(1000)
+    monkeypatch.setattr(utils.cache, "time", SimpleNamespace(time=lambda: next(clock)))
+
+    def make(**limits):
+        return SuggestionCache(tmp_path / "suggestions.sqlite", **limits)
+
+    return make
+
+
+def stored(cache, prompts):
+    return set(cache.get_many(prompts, "model", PARAMS))
+
+
+def test_evicts_least_recently_used_over_max_entries(cache):
+    suggestions = cache(max_entries=3)
+    for prompt in "abcde":
+        suggestions.put_many({prompt: prompt.upper()}, "model", PARAMS)
+    assert stored(suggestions, list("abcde")) == {"c", "d", "e"}
+
+
+def test_lookup_refreshes_recency(cache):
+    suggestions = cache(max_entries=3)
+    for prompt in "abc":
+        suggestions.put_many({prompt: prompt.upper()}, "model", PARAMS)
+    suggestions.get_many(["a"], "model", PARAMS)
+    suggestions.put_many({"d": "D"}, "model", PARAMS)
+    assert stored(suggestions, list("abcd")) == {"a", "c", "d"}
+
+
+def test_evicts_over_max_bytes(cache):
+    suggestions = cache(max_bytes=25)
+    for prompt in "abcd":
+        suggestions.put_many({prompt: prompt * 10}, "model", PARAMS)
+    assert stored(suggestions, list("abcd")) == {"c", "d"}
+
+
+def test_entries_are_keyed_by_model_and_params(cache):
+    suggestions = cache()
+    suggestions.put_many({"a": "A"}, "model", PARAMS)
+    assert suggestions.get_many(["a"], "other-model", PARAMS) == {}
+    assert suggestions.get_many(["a"], "model", {"max_new_tokens": 20}) == {}
+    assert suggestions.get_many(["  a "], "model", PARAMS) == {"  a ": "A"}
+
+
+def test_suggest_alternatives_generates_each_distinct_prompt_once(cache):
+    suggestions, generator = cache(), StubGenerator()
+    prompts = ["Lamp Answer:", "Lamp  Answer:", "Desk Answer:", "Lamp Answer:"]
+    assert suggest_alternatives(generator, prompts, suggestions, "model") == ["Vietnam, India"] * 4
+    assert sorted(generator.prompts) == ["Desk Answer:", "Lamp Answer:"]
+
+    # Everything is cached now, so a generator that would crash is never called
+    assert suggest_alternatives(StubGenerator(fail_on=1), prompts, suggestions, "model") == ["Vietnam, India"] * 4
@@ -0,0 +1,43 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from utils.facets import FacetIndex
+
+
+def labels():
+    rng = np.random.default_rng(0)
+    origin = rng.choice(["China", "Vietnam", "India", None], size=500)
+    return {
+        "made_in_china": pd.Series(rng.choice(["Yes", "Unclear", "No"], size=500)),
+        "likely_origin": pd.Series(origin, dtype="object"),
+        "price_band": pd.cut(rng.uniform(0, 120, size=500), [0, 10, 50, np.inf], labels=["low", "mid", "high"]),
+    }
+
+
+def test_rows_match_boolean_masks_for_every_selection():
+    facets = labels()
+    index = FacetIndex(facets)
+    choices = [[(name, value) for value in index.values(name)] for name in facets]
+    for r in range(1, len(choices) + 1):
+        for names in itertools.combinations(choices, r):
+            for selections in itertools.product(*names):
+                mask = np.ones(index.size, dtype=bool)
+                for name, value in selections:
+                    mask &= (pd.Series(facets[name]) == value).to_numpy()
+                np.testing.assert_array_equal(index.rows(selections), np.flatnonzero(mask))
+
+
+def test_missing_labels_never_match_and_empty_selection_is_everything():
+    facets = labels()
+    index = FacetIndex(facets)
+    assert set(index.values("likely_origin")) == {"China", "Vietnam", "India"}
+    matched = np.concatenate([index.rows([("likely_origin", value)]) for value in index.values("likely_origin")])
+    np.testing.assert_array_equal(np.sort(matched), np.flatnonzero(facets["likely_origin"].notna().to_numpy()))
+    np.testing.assert_array_equal(index.rows(()), np.arange(index.size))
+
+
+def test_unknown_value_matches_nothing():
+    index = FacetIndex(labels())
+    assert len(index.rows([("made_in_china", "yes"), ("price_band", "low")])) == 0
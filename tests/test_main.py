@@ -0,0 +1,93 @@
+import json
+
+import numpy as np
+import pytest
+
+import core.pipeline
+import main
+from conftest import StubEmbedder, StubGenerator
+from utils.checkpoint import checkpoint_path
+from utils.writers import embeddings_path
+
+
+@pytest.fixture
+def run(monkeypatch, products_csv):
+    """Call main.main with stub models; generator is the StubGenerator to use for that run."""
+    monkeypatch.setattr(core.pipeline, "load_embedder", lambda *args, **kwargs: StubEmbedder())
+
+    def run(output, *extra, generator=None):
+        monkeypatch.setattr(main, "load_generator", lambda *args, **kwargs: generator or StubGenerator())
+        main.main(["--input", str(products_csv), "--output", str(output), "--chunk-size", "5", "--generate-for", "all", *extra])
+
+    return run
+
+
+def test_resume_after_crash_matches_uninterrupted_run(run, tmp_path):
+    output = tmp_path / "out.csv"
+    with pytest.raises(RuntimeError):
+        run(output, generator=StubGenerator(fail_on=3))
+    state = json.loads(checkpoint_path(output).read_text())
+    assert (state["chunks_done"], state["rows_done"]) == (2, 10)
+
+    # Simulate a crash in the middle of writing the next chunk
+    with open(output, "a", encoding="utf-8") as f:
+        f.write("Product 10,15.0,half a row")
+    with open(embeddings_path(output), "ab") as f:
+        f.write(b"\x01" * 40)
+
+    run(output, "--resume")
+    reference = tmp_path / "reference.csv"
+    run(reference)
+    assert output.read_bytes() == reference.read_bytes()
+    np.testing.assert_array_equal(np.load(embeddings_path(output)), np.load(embeddings_path(reference)))
+    assert np.load(embeddings_path(output)).shape == (23, 16)
+
+
+def test_resume_rejects_changed_embedding_setting(run, tmp_path):
+    output = tmp_path / "out.csv"
+    with pytest.raises(RuntimeError):
+        run(output, "--no-embeddings", generator=StubGenerator(fail_on=2))
+    with pytest.raises(SystemExit, match="embeddings"):
+        run(output, "--resume")
+
+
+def test_resume_rejects_changed_generation_policy(run, tmp_path):
+    output = tmp_path / "out.csv"
+    with pytest.raises(RuntimeError):
+        run(output, generator=StubGenerator(fail_on=2))
+    with pytest.raises(SystemExit, match="policy"):
+        run(output, "--resume", "--min-price", "10")
+
+
+def test_resume_rejects_changed_input(run, tmp_path, products_csv):
+    output = tmp_path / "out.csv"
+    with pytest.raises(RuntimeError):
+        run(output, generator=StubGenerator(fail_on=2))
+    with open(products_csv, "a", encoding="utf-8") as f:
+        f.write("New product,Plastic toy,3.0\n")
+    with pytest.raises(SystemExit, match="input file"):
+        run(output, "--resume")
+
+
+@pytest.mark.parametrize("option, value", [
+    ("--embedder", "other/model"),
+    ("--embedder-backend", "onnx"),
+    ("--generator", "other/model"),
+    ("--generator-backend", "int8"),
+])
+def test_resume_rejects_changed_model(run, tmp_path, option, value):
+    output = tmp_path / "out.csv"
+    with pytest.raises(RuntimeError):
+        run(output, generator=StubGenerator(fail_on=2))
+    with pytest.raises(SystemExit, match=option.lstrip("-").replace("-", "_")):
+        run(output, "--resume", option, value)
+
+
+def test_parquet_output_is_not_checkpointed_or_resumable(run, tmp_path, capsys):
+    pytest.importorskip("pyarrow")
+    output = tmp_path / "out.parquet"
+    run(output)
+    assert not checkpoint_path(output).exists()
+    with pytest.raises(SystemExit):
+        run(output, "--resume")
+    assert "--resume needs CSV output" in capsys.readouterr().err
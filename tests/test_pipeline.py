@@ -0,0 +1,76 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from core.pipeline import ordered_map, staged
+
+
+def test_staged_keeps_input_order_across_stages():
+    def slow_for_even(x):
+        time.sleep(0.002 * (x % 2 == 0))
+        return x * 10
+
+    assert list(staged(range(20), [slow_for_even, lambda x: x + 1], maxsize=1)) == [x * 10 + 1 for x in range(20)]
+
+
+def test_staged_runs_each_stage_on_its_own_thread():
+    seen = {}
+
+    def record(name):
+        def stage(x):
+            seen.setdefault(name, set()).add(threading.get_ident())
+            return x
+        return stage
+
+    list(staged(range(5), [record("a"), record("b")]))
+    assert len(seen["a"]) == len(seen["b"]) == 1
+    assert seen["a"] != seen["b"] and threading.get_ident() not in seen["a"] | seen["b"]
+
+
+def test_staged_passes_dataframes_through():
+    frames = [pd.DataFrame({"x": [i, i]}) for i in range(3)]
+    assert [frame["x"].iloc[0] for frame in staged(frames, [lambda frame: frame])] == [0, 1, 2]
+
+
+def test_staged_reraises_stage_error_after_earlier_results():
+    def fail_on_three(x):
+        if x == 3:
+            raise ValueError("bad chunk")
+        return x
+
+    results = []
+    with pytest.raises(ValueError, match="bad chunk"):
+        for item in staged(range(10), [fail_on_three, lambda x: x]):
+            results.append(item)
+    assert results == [0, 1, 2]
+
+
+def test_staged_reraises_error_from_input_iterator():
+    def items():
+        yield 1
+        raise OSError("read failed")
+
+    with pytest.raises(OSError, match="read failed"):
+        list(staged(items(), [lambda x: x]))
+
+
+def test_ordered_map_yields_in_input_order_with_bounded_window():
+    in_flight, peak = 0, 0
+    lock = threading.Lock()
+
+    def work(x, offset):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.001 * (7 - x % 7))
+        with lock:
+            in_flight -= 1
+        return x + offset
+
+    with ThreadPoolExecutor(4) as executor:
+        assert list(ordered_map(executor, work, range(30), 3, 100)) == [x + 100 for x in range(30)]
+    assert peak <= 3
@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from core.schema import apply_schema, read_results
+
+
+@pytest.fixture
+def results():
+    return apply_schema(pd.DataFrame({
+        "title": [f"Product {i}" for i in range(6)],
+        "price": [149999.99, 2.5, 10.0, 20.0, None, 7.25],
+        "description": ["a", None, "c", "d", "e", "f"],
+        "made_in_china": ["Yes", "No", "Yes", "Unclear", "Yes", "No"],
+        "tariff_vulnerability": ["High", "Low", "High", "Medium", "High", "Low"],
+        "likely_origin": ["China", "India", "China", "Vietnam", "China", "Mexico"],
+        "alt_sourcing": ["Vietnam", None, None, "India", None, None],
+    }))
+
+
+@pytest.fixture(params=["csv", "parquet"])
+def results_file(request, tmp_path, results):
+    path = tmp_path / f"results.{request.param}"
+    if request.param == "csv":
+        results.to_csv(path, index=False)
+    else:
+        pytest.importorskip("pyarrow")
+        results.to_parquet(path, row_group_size=2)
+    return path
+
+
+def test_filters_match_in_memory_filtering_for_both_formats(results_file, results):
+    df = read_results(results_file, ["title", "price"], filters={"made_in_china": "Yes", "tariff_vulnerability": "High"})
+    assert list(df.columns) == ["title", "price"]
+    assert list(df.index) == [0, 1, 2]
+    assert df["title"].tolist() == ["Product 0", "Product 2", "Product 4"]
+
+
+def test_prices_are_downcast_only_when_read(results_file, results):
+    assert results["price"].dtype == "float64"
+    assert read_results(results_file, ["price"])["price"].dtype == "float32"
+    if results_file.suffix == ".csv":
+        assert "149999.99" in results_file.read_text()
+
+
+def test_unknown_labels_warn_and_read_as_missing(tmp_path, results):
+    path = tmp_path / "results.csv"
+    results.astype({"made_in_china": str}).replace({"made_in_china": {"Unclear": "unclear"}}).to_csv(path, index=False)
+    with pytest.warns(UserWarning, match="made_in_china value.*unclear"):
+        df = read_results(path)
+    assert df["made_in_china"].isna().sum() == 1
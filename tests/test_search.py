@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from conftest import StubEmbedder
+from utils.search import FullTextIndex, SemanticIndex, fts_query
+
+
+def text_index():
+    df = pd.DataFrame({
+        "title": ["Steel desk lamp", "Bamboo lamp shade", "Steel water bottle", None],
+        "description": [None, "Handmade in Vietnam", "Keeps drinks cold", "Gadget with no title"],
+    })
+    return FullTextIndex(df, ["title", "description", "alt_sourcing"])
+
+
+def test_full_text_search_matches_word_prefixes_case_insensitively():
+    index = text_index()
+    assert index.columns == ["title", "description"]
+    assert index.search("STEE").tolist() == [0, 2]
+    assert index.search("vietnam").tolist() == [1]
+
+
+def test_full_text_search_requires_every_word():
+    assert text_index().search("steel lamp").tolist() == [0]
+    assert text_index().search("steel shade").tolist() == []
+
+
+def test_full_text_search_ignores_punctuation_and_empty_queries():
+    index = text_index()
+    assert fts_query('"desk" OR (lamp)') == '"desk"* "OR"* "lamp"*'
+    assert index.search("desk-lamp!").tolist() == [0]
+    assert index.search("").tolist() == []
+    assert index.search(" ?!* ").tolist() == []
+
+
+def test_full_text_search_handles_missing_cells():
+    index = text_index()
+    assert index.size == 4
+    assert index.search("gadget").tolist() == [3]
+
+
+def test_semantic_index_exact_top_k_matches_brute_force():
+    texts = [f"Product {i}" for i in range(40)]
+    vectors = StubEmbedder().encode(texts)
+    index = SemanticIndex(vectors)
+    assert index.backend == "exact"
+
+    positions, scores = index.query(vectors[7], k=5)
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = np.argsort(-(normalized @ normalized[7]), kind="stable")[:5]
+    assert positions[0] == 7 and np.isclose(scores[0], 1.0)
+    np.testing.assert_array_equal(positions, expected)
+    assert np.all(np.diff(scores) <= 0)
+
+
+def test_semantic_index_clips_k_and_tolerates_zero_vectors():
+    vectors = np.vstack([StubEmbedder().encode(["a", "b"]), np.zeros((1, 16))])
+    positions, scores = SemanticIndex(vectors).query(vectors[0], k=10)
+    assert sorted(positions.tolist()) == [0, 1, 2]
+    assert np.isfinite(scores).all()
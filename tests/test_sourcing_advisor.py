@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import StubGenerator
+from core.pipeline import add_suggestions
+from core.sourcing_advisor import GenerationPolicy
+
+
+def classified(**columns):
+    frame = {
+        "title": [f"Product {i}" for i in range(5)],
+        "description": ["Steel gadget"] * 5,
+        "tariff_vulnerability": ["High", "Medium", "Low", "High", "Medium"],
+        "price": [50.0, np.nan, 30.0, 0.0, 10.0],
+    }
+    frame.update(columns)
+    return pd.DataFrame(frame)
+
+
+def test_default_policy_keeps_high_and_medium_tiers():
+    np.testing.assert_array_equal(GenerationPolicy().mask(classified()), [True, True, False, True, True])
+    np.testing.assert_array_equal(GenerationPolicy(("Low",)).mask(classified()), [False, False, True, False, False])
+
+
+def test_min_price_excludes_missing_prices():
+    np.testing.assert_array_equal(GenerationPolicy(min_price=10).mask(classified()), [True, False, False, False, True])
+
+
+def test_min_margin_excludes_zero_price_and_missing_cost():
+    frame = classified(cost=[20.0, 5.0, 10.0, 0.0, np.nan])
+    # margins: 0.6, NaN (no price), 0.67 (Low tier), 0/0, NaN (no cost)
+    np.testing.assert_array_equal(GenerationPolicy(min_margin=0.3).mask(frame), [True, False, False, False, False])
+    frame.loc[3, "cost"] = 5.0  # -inf margin
+    assert not GenerationPolicy(min_margin=0.3).mask(frame)[3]
+
+
+def test_min_margin_needs_cost_column():
+    with pytest.raises(ValueError, match="cost"):
+        GenerationPolicy(min_margin=0.3).mask(classified())
+
+
+def test_add_suggestions_leaves_rejected_rows_empty_and_ungenerated():
+    generator = StubGenerator()
+    frame = add_suggestions(classified(), generator, None, "model", batch_size=2, policy=GenerationPolicy(("High",)))
+    np.testing.assert_array_equal(frame["alt_sourcing"].isna(), [False, True, True, False, True])
+    assert set(frame["alt_sourcing"].dropna()) == {"Vietnam, India"}
+    assert sorted(prompt.split("\n")[1] for prompt in generator.prompts) == ["Title: Product 0", "Title: Product 3"]
+
+
+def test_add_suggestions_without_generator_is_all_empty():
+    assert add_suggestions(classified(), None, None, "model", batch_size=2)["alt_sourcing"].isna().all()
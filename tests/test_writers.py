@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.writers import CsvSink, NpySink, ParquetSink, embeddings_path, open_sink
+
+
+def frame(start, stop):
+    return pd.DataFrame({"title": [f"Product {i}" for i in range(start, stop)], "price": np.arange(start, stop, dtype=float)})
+
+
+def test_npy_sink_is_loadable_after_every_write(tmp_path):
+    path = tmp_path / "vectors.npy"
+    blocks = [np.random.default_rng(i).standard_normal((n, 4)) for i, n in enumerate([3, 5, 1])]
+    with NpySink(path) as sink:
+        for i, block in enumerate(blocks):
+            sink.write(block)
+            loaded = np.load(path)
+            assert loaded.dtype == np.float16
+            np.testing.assert_array_equal(loaded, np.concatenate(blocks[:i + 1]).astype(np.float16))
+    with open(path, "rb") as f:
+        header = f.read(NpySink.HEADER_SIZE)
+    # Fixed-size v1.0 header, so the data offset never moves as the row count grows
+    assert header[:8] == b"\x93NUMPY\x01\x00" and int.from_bytes(header[8:10], "little") == NpySink.HEADER_SIZE - 10
+    assert header.endswith(b"\n")
+    assert np.load(path, mmap_mode="r").shape == (9, 4)
+
+
+def test_npy_sink_resume_drops_rows_after_checkpoint(tmp_path):
+    path = tmp_path / "vectors.npy"
+    first, extra, second = (np.full((n, 2), value) for n, value in [(4, 1.0), (3, 2.0), (2, 3.0)])
+    with NpySink(path) as sink:
+        sink.write(first)
+        sink.write(extra)
+    with NpySink(path, resume_rows=4) as sink:
+        assert np.load(path).shape == (4, 2)
+        sink.write(second)
+    np.testing.assert_array_equal(np.load(path), np.concatenate([first, second]).astype(np.float16))
+
+
+def test_npy_sink_rejects_other_dimension_after_resume(tmp_path):
+    path = tmp_path / "vectors.npy"
+    with NpySink(path) as sink:
+        sink.write(np.ones((3, 16)))
+    with NpySink(path, resume_rows=3) as sink:
+        with pytest.raises(ValueError, match="16-dimensional"):
+            sink.write(np.ones((2, 8)))
+    assert np.load(path).shape == (3, 16)
+
+
+def test_csv_sink_resume_truncates_to_checkpoint_without_second_header(tmp_path):
+    path = tmp_path / "out.csv"
+    with CsvSink(path) as sink:
+        sink.write(frame(0, 3))
+        checkpoint_bytes = sink.bytes_written
+        sink.write(frame(3, 5))
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("Product 5,")
+
+    with CsvSink(path, resume_at=checkpoint_bytes) as sink:
+        sink.write(frame(3, 6))
+    pd.testing.assert_frame_equal(pd.read_csv(path), frame(0, 6))
+
+
+def test_csv_sink_resume_at_zero_writes_header(tmp_path):
+    path = tmp_path / "out.csv"
+    path.write_text("partial", encoding="utf-8")
+    with CsvSink(path, resume_at=0) as sink:
+        sink.write(frame(0, 2))
+    pd.testing.assert_frame_equal(pd.read_csv(path), frame(0, 2))
+
+
+def test_parquet_sink_refuses_to_resume(tmp_path):
+    pytest.importorskip("pyarrow")
+    with pytest.raises(ValueError):
+        ParquetSink(tmp_path / "out.parquet", resume_at=100)
+
+
+def test_open_sink_and_embeddings_path(tmp_path):
+    pytest.importorskip("pyarrow")
+    assert isinstance(open_sink(tmp_path / "out.PARQUET"), ParquetSink)
+    with open_sink(tmp_path / "out.csv") as sink:
+        assert isinstance(sink, CsvSink)
+    assert embeddings_path(tmp_path / "results.parquet") == tmp_path / "results.embeddings.npy"
@@ -0,0 +1,272 @@
+import hashlib
+import math
+import warnings
+
+import numpy as np
+import streamlit as st
+
+import pandas as pd
+
+from core.schema import RESULT_COLUMNS, is_parquet, read_results, result_columns
+from utils.facets import FacetIndex
+from utils.search import FullTextIndex, SemanticIndex
+
+PRICE_BINS = [0, 10, 25, 50, 100, np.inf]
+PRICE_BANDS = ["Under $10", "$10–25", "$25–50", "$50–100", "$100+"]
+
+# Facet name -> (filter label, source column)
+FACETS = {
+    "made_in_china": ("Made in China", "made_in_china"),
+    "tariff_vulnerability": ("Tariff Vulnerability", "tariff_vulnerability"),
+    "likely_origin": ("Likely Origin", "likely_origin"),
+    "price_band": ("Price Band", "price"),
+}
+
+
+def file_digest(uploaded_file):
+    """SHA-1 of an uploaded file, hashed once per upload and remembered in session state."""
+    digests = st.session_state.setdefault("_file_digests", {})
+    upload_id = getattr(uploaded_file, "file_id", None) or (uploaded_file.name, uploaded_file.size)
+    if upload_id not in digests:
+        digests[upload_id] = hashlib.sha1(uploaded_file.getvalue()).hexdigest()
+    return digests[upload_id]
+
+
+@st.cache_resource(max_entries=4)
+def available_columns(digest, _uploaded_file):
+    """Result columns present in the file, in schema order."""
+    stored = result_columns(_uploaded_file)
+    return [column for column in RESULT_COLUMNS if column in stored] + [c for c in stored if c not in RESULT_COLUMNS]
+
+
+@st.cache_resource
+def _read_warnings():
+    """Schema warnings (e.g. unknown labels) raised while reading each file, by digest."""
+    return {}
+
+
+def _read_results(digest, uploaded_file, columns=None):
+    """read_results, remembering its schema warnings so load_results can show them on every rerun."""
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        df = read_results(uploaded_file, columns)
+    messages = _read_warnings().setdefault(digest, [])
+    messages.extend(str(w.message) for w in caught if str(w.message) not in messages)
+    return df
+
+
+@st.cache_resource(max_entries=2, show_spinner="Loading results...")
+def parsed_csv(digest, _uploaded_file):
+    """Every column of a CSV upload, parsed once; column subsets and facets are taken from this frame."""
+    return _read_results(digest, _uploaded_file)
+
+
+@st.cache_resource(max_entries=4, show_spinner="Loading results...")
+def results_frame(digest, columns, _uploaded_file):
+    """Results frame for the given columns, shared read-only across reruns.
+
+    Parquet reads only these columns. A CSV has to be scanned whole anyway,
+    so it is parsed once (parsed_csv) and projected in memory; with
+    copy-on-write the projection shares the parsed columns.
+    """
+    if is_parquet(_uploaded_file):
+        return _read_results(digest, _uploaded_file, list(columns))
+    return parsed_csv(digest, _uploaded_file)[list(columns)]
+
+
+def load_results(digest, columns, uploaded_file):
+    """results_frame, plus a warning for anything read_results flagged in the file."""
+    df = results_frame(digest, columns, uploaded_file)
+    for message in _read_warnings().get(digest, ()):
+        st.warning(message)
+    return df
+
+
+@st.cache_resource(max_entries=4, show_spinner="Indexing facets...")
+def facet_index(digest, _uploaded_file):
+    """FacetIndex over the file's facet columns, built once per upload."""
+    if is_parquet(_uploaded_file):
+        stored = available_columns(digest, _uploaded_file)
+        facet_df = _read_results(digest, _uploaded_file, [source for _, source in FACETS.values() if source in stored])
+    else:
+        facet_df = parsed_csv(digest, _uploaded_file)
+
+    facets = {}
+    for name, (_, source) in FACETS.items():
+        if source not in facet_df.columns:
+            continue
+        if name == "price_band":
+            facets[name] = pd.cut(facet_df[source], PRICE_BINS, labels=PRICE_BANDS, right=False)
+        else:
+            facets[name] = facet_df[source]
+    return FacetIndex(facets)
+
+
+def facet_filters(index):
+    """One selectbox per indexed facet; returns the active (facet, value) pairs."""
+    names = list(index.postings)
+    if not names:
+        return ()
+    selections = []
+    for col, name in zip(st.columns(len(names)), names):
+        with col:
+            label = FACETS[name][0]
+            value = st.selectbox(f"Filter by {label}:", ["All", *index.values(name)], key=f"facet_{name}")
+        if value != "All":
+            selections.append((name, value))
+    return tuple(selections)
+
+
+@st.cache_resource(max_entries=32, show_spinner="Filtering results...")
+def filter_rows(digest, selections, _uploaded_file):
+    """File row positions matching the selected facets (None for all rows), memoized per (file, selections).
+
+    Matching rows come from intersecting the prebuilt facet postings, so no
+    column is scanned per filter. Only the position arrays are cached; the
+    frame is sliced with iloc when a page or download is rendered.
+    """
+    if not selections:
+        return None
+    return facet_index(digest, _uploaded_file).rows(selections)
+
+
+def column_picker(digest, uploaded_file):
+    """Multiselect of columns to display; unselected columns are never parsed.
+
+    Stops the script run while nothing is selected, since there is no table
+    to filter, search or download.
+    """
+    columns = available_columns(digest, uploaded_file)
+    selected = tuple(st.multiselect("Columns to display:", columns, default=columns))
+    if not selected:
+        st.info("Select at least one column to display.")
+        st.stop()
+    return selected
+
+
+PAGE_SIZES = [25, 50, 100, 250]
+SEARCH_COLUMNS = ["title", "description", "alt_sourcing"]
+
+
+@st.cache_resource(max_entries=16)
+def sort_order(token, column, ascending, _df, _rows):
+    """The row positions _rows sorted by one column of df (missing values last), memoized per view."""
+    values = _df[column].iloc[_rows].reset_index(drop=True)
+    ordered = values.sort_values(ascending=ascending, kind="stable", na_position="last")
+    return _rows[ordered.index.to_numpy()]
+
+
+@st.cache_resource(max_entries=2, show_spinner="Building search index...")
+def text_index(token, _df):
+    """Full-text index over the displayed text columns of df (None if there are none), built once per token."""
+    columns = [column for column in SEARCH_COLUMNS if column in _df.columns]
+    return FullTextIndex(_df, columns) if columns else None
+
+
+@st.cache_resource(max_entries=16)
+def search_mask(token, query, _df):
+    """Boolean mask of rows whose searchable text columns contain query (case-insensitive)."""
+    mask = np.zeros(len(_df), dtype=bool)
+    for column in SEARCH_COLUMNS:
+        if column in _df.columns:
+            mask |= _df[column].str.contains(query, case=False, regex=False, na=False).to_numpy()
+    return mask
+
+
+def indexed_search_mask(index, query):
+    """Boolean mask over file rows from a FullTextIndex keyed by file row positions."""
+    member = np.zeros(index.size, dtype=bool)
+    member[index.search(query)] = True
+    return member
+
+
+def paginated_table(df, token, rows=None, key="results", load_search_index=None):
+    """Render one page of df's rows (all, or the file row positions in rows); search, sort and slicing happen server-side.
+
+    Only the visible page is sliced out of df and sent to the browser, so the
+    cost per rerun is bounded by the page size instead of the number of rows.
+    token identifies the view (file digest, columns and filters) for
+    memoization. load_search_index is called for a FullTextIndex the first
+    time a query is entered, making search a keyword lookup instead of a
+    substring scan; nothing is indexed for users who never search.
+    """
+    search_col, sort_col, order_col, size_col = st.columns([3, 2, 1, 1])
+    with search_col:
+        query = st.text_input("Search titles, descriptions and suggestions:", key=f"{key}_query").strip()
+    with sort_col:
+        sort_column = st.selectbox("Sort by:", ["(none)", *df.columns], key=f"{key}_sort")
+    with order_col:
+        ascending = st.radio("Order:", ["Asc", "Desc"], key=f"{key}_order") == "Asc"
+    with size_col:
+        page_size = st.selectbox("Rows per page:", PAGE_SIZES, key=f"{key}_page_size")
+
+    positions = np.arange(len(df)) if rows is None else rows
+    if sort_column != "(none)":
+        positions = sort_order(token, sort_column, ascending, df, positions)
+    if query:
+        search_index = load_search_index() if load_search_index else None
+        mask = indexed_search_mask(search_index, query) if search_index else search_mask(token, query, df)
+        positions = positions[mask[positions]]
+
+    # Go back to the first page whenever the underlying view changes
+    view = (token, query, sort_column, ascending, page_size)
+    if st.session_state.get(f"{key}_view") != view:
+        st.session_state[f"{key}_view"] = view
+        st.session_state[f"{key}_page"] = 1
+
+    total = len(positions)
+    pages = max(1, math.ceil(total / page_size))
+    page = st.number_input(f"Page (of {pages}):", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+    start = (page - 1) * page_size
+    visible = positions[start:start + page_size]
+
+    st.dataframe(df.iloc[visible])
+    st.caption(f"Showing rows {min(start + 1, total)}–{start + len(visible)} of {total:,}")
+    return positions
+
+
+@st.cache_resource(max_entries=2, show_spinner="Indexing embeddings...")
+def semantic_index(digest, _embeddings_file):
+    """SemanticIndex over an uploaded .npy of product embeddings (as written by main.py)."""
+    _embeddings_file.seek(0)
+    return SemanticIndex(np.load(_embeddings_file))
+
+
+def similar_products(digest, columns, uploaded_file, index, key="similar"):
+    """Pick a row by its table index and list the products whose embeddings are closest to it."""
+    df = results_frame(digest, columns, uploaded_file)
+    if len(df) != len(index.vectors):
+        st.error(f"The embeddings file has {len(index.vectors):,} rows but the results have {len(df):,}.")
+        return
+
+    row_col, k_col = st.columns([3, 1])
+    with row_col:
+        row = st.number_input("Product row # (the table's index column):", min_value=0, max_value=len(df) - 1, step=1, key=f"{key}_row")
+    with k_col:
+        k = st.selectbox("Matches:", [10, 25, 50], key=f"{key}_k")
+
+    positions, scores = index.query(index.vectors[row], k + 1)
+    keep = positions != row
+    if "title" in df.columns:
+        st.caption(f"Products similar to: {df['title'].iloc[row]} ({index.backend} search)")
+    st.dataframe(df.iloc[positions[keep][:k]].assign(similarity=scores[keep][:k]))
+
+
+# Payloads can be as large as the export itself, so only the latest one is kept
+@st.cache_data(max_entries=1, show_spinner="Preparing download...")
+def results_csv(token, _df, _rows=None):
+    return (_df if _rows is None else _df.iloc[_rows]).to_csv(index=False).encode('utf-8')
+
+
+def lazy_download_button(label, token, df, file_name, rows=None):
+    """Download button whose CSV payload (df, or its file row positions in rows) is only serialized after the user asks for it.
+
+    token identifies the frame contents (e.g. file digest plus filters) so a
+    prepared payload is dropped as soon as the selection changes.
+    """
+    state_key = f"_download_{file_name}"
+    if st.session_state.get(state_key) != token:
+        if not st.button(f"{label} (prepare)", key=f"{state_key}_prepare"):
+            return
+        st.session_state[state_key] = token
+    st.download_button(label, data=results_csv(token, df, rows), file_name=file_name, mime='text/csv')
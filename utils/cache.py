@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+import numpy as np
+
+CACHE_DIR = Path(os.environ.get("TARIFFHUNTER_CACHE_DIR", ".cache/tariffhunter"))
+SQLITE_MAX_PARAMS = 900
+
+
+def cache_path(*parts):
+    """Path under the cache directory, creating parent folders as needed."""
+    path = CACHE_DIR.joinpath(*parts)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def slugify(value):
+    """Filesystem-safe version of a model id such as 'org/model-name'."""
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", str(value)).strip("_")
+
+
+def normalize_text(text):
+    """Collapse whitespace so trivially different copies share a cache key."""
+    return " ".join(str(text).split())
+
+
+def content_key(*parts):
+    """Stable hex digest of the given string parts."""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite store of float16 text embeddings keyed by hash(model id, normalized text).
+
+    One file per (model, revision), so updated weights never reuse vectors
+    from an earlier revision.
+    """
+
+    def __init__(self, model_name, path=None, revision="main"):
+        self.model_name = model_name if revision == "main" else f"{model_name}@{revision}"
+        self.path = path or cache_path("embeddings", f"{slugify(model_name)}@{slugify(revision)}.sqlite")
+        # WAL plus a busy timeout lets several worker processes share the cache file;
+        # the connection may be opened on one thread and used by a pipeline stage thread
+        self.conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+
+    def key(self, text):
+        return content_key(self.model_name, normalize_text(text))
+
+    def get_many(self, texts):
+        """Cached vectors by position, plus the positions that were not cached."""
+        keys = [self.key(text) for text in texts]
+        found = {}
+        for start in range(0, len(keys), SQLITE_MAX_PARAMS):
+            batch = keys[start:start + SQLITE_MAX_PARAMS]
+            placeholders = ",".join("?" * len(batch))
+            found.update(self.conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+            ))
+        hits = {i: np.frombuffer(found[key], dtype=np.float16) for i, key in enumerate(keys) if key in found}
+        missing = [i for i in range(len(keys)) if i not in hits]
+        return hits, missing
+
+    def put_many(self, texts, vectors):
+        rows = [(self.key(text), np.asarray(vector, dtype=np.float16).tobytes()) for text, vector in zip(texts, vectors)]
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows)
+
+    def close(self):
+        self.conn.close()
+
+
+class SuggestionCache:
+    """SQLite LRU cache of generated text keyed by hash(model, generation params, normalized prompt).
+
+    Least recently used entries are evicted once either max_entries or
+    max_bytes of stored responses is exceeded.
+    """
+
+    def __init__(self, path=None, max_entries=200_000, max_bytes=256 * 1024 * 1024):
+        self.path = path or cache_path("suggestions.sqlite")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS suggestions ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS suggestions_last_used ON suggestions (last_used)")
+
+    @staticmethod
+    def key(prompt, model_name, params):
+        return content_key(model_name, json.dumps(params, sort_keys=True), normalize_text(prompt))
+
+    def get_many(self, prompts, model_name, params):
+        """Cached responses for the prompts that have one, as {prompt: response}."""
+        keys = {self.key(prompt, model_name, params): prompt for prompt in prompts}
+        found = {}
+        key_list = list(keys)
+        for start in range(0, len(key_list), SQLITE_MAX_PARAMS):
+            batch = key_list[start:start + SQLITE_MAX_PARAMS]
+            placeholders = ",".join("?" * len(batch))
+            found.update(self.conn.execute(
+                f"SELECT key, response FROM suggestions WHERE key IN ({placeholders})", batch
+            ))
+        if found:
+            now = time.time()
+            with self.conn:
+                self.conn.executemany("UPDATE suggestions SET last_used = ? WHERE key = ?", [(now, key) for key in found])
+        return {keys[key]: response for key, response in found.items()}
+
+    def put_many(self, responses, model_name, params):
+        """Store {prompt: response} pairs and evict least recently used entries over the limits."""
+        now = time.time()
+        rows = [
+            (self.key(prompt, model_name, params), response, len(response.encode("utf-8")), now)
+            for prompt, response in responses.items()
+        ]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO suggestions (key, response, size, last_used) VALUES (?, ?, ?, ?)", rows
+            )
+            self._evict()
+
+    def _evict(self):
+        count, total = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM suggestions").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        excess_rows = max(count - self.max_entries, 0)
+        excess_bytes = max(total - self.max_bytes, 0)
+        doomed = []
+        for key, size in self.conn.execute("SELECT key, size FROM suggestions ORDER BY last_used"):
+            if len(doomed) >= excess_rows and excess_bytes <= 0:
+                break
+            doomed.append((key,))
+            excess_bytes -= size
+        self.conn.executemany("DELETE FROM suggestions WHERE key = ?", doomed)
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,49 @@
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+
+def file_hash(path, block_size=1 << 20):
+    """SHA-256 of a file's contents, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def checkpoint_path(output_path):
+    return Path(f"{output_path}.checkpoint.json")
+
+
+@dataclass
+class Checkpoint:
+    """Progress of a classification run, saved after every completed chunk."""
+
+    path: str
+    input_hash: str
+    chunk_size: int
+    chunks_done: int = 0
+    rows_done: int = 0
+    output_bytes: int = 0
+    # Options that change what is written (e.g. whether embeddings are saved);
+    # a resumed run must use the same ones so appended rows match earlier ones
+    settings: dict = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path):
+        path = Path(path)
+        if not path.exists():
+            return None
+        with open(path, encoding="utf-8") as f:
+            return cls(path=str(path), **json.load(f))
+
+    def save(self):
+        state = asdict(self)
+        del state["path"]
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp, self.path)
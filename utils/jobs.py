@@ -0,0 +1,59 @@
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Job:
+    """A background analysis job; results grow as batches finish."""
+
+    id: str
+    total: int
+    results: list = field(default_factory=list)
+    done: bool = False
+    error: str = None
+
+    @property
+    def progress(self):
+        return len(self.results) / self.total if self.total else 1.0
+
+
+class JobQueue:
+    """Local worker pool that runs a batch function over items in the background.
+
+    Jobs are looked up by id, so a UI can poll progress and partial results
+    from any later request.
+    """
+
+    def __init__(self, max_workers=1, max_jobs=50):
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix="job")
+        self.max_jobs = max_jobs
+        self.jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, items, batch_size=8):
+        """Start fn(batch) -> list of results over items in batches; returns the job id."""
+        items = list(items)
+        job = Job(uuid.uuid4().hex[:8], len(items))
+        with self._lock:
+            self.jobs[job.id] = job
+            # Forget the oldest finished jobs beyond max_jobs
+            finished = [job_id for job_id, other in self.jobs.items() if other.done]
+            for job_id in finished[:max(0, len(self.jobs) - self.max_jobs)]:
+                del self.jobs[job_id]
+        self.executor.submit(self._run, job, fn, items, batch_size)
+        return job.id
+
+    @staticmethod
+    def _run(job, fn, items, batch_size):
+        try:
+            for start in range(0, len(items), batch_size):
+                job.results.extend(fn(items[start:start + batch_size]))
+        except Exception as error:
+            job.error = f"{type(error).__name__}: {error}"
+        finally:
+            job.done = True
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
@@ -0,0 +1,188 @@
+import numpy as np
+
+from utils.cache import cache_path, slugify
+
+DEFAULT_EMBEDDER = "sentence-transformers/all-MiniLM-L6-v2"
+DEFAULT_GENERATOR = "mistralai/Mistral-7B-Instruct-v0.2"
+EMBEDDER_BACKENDS = ("torch", "onnx", "onnx-int8")
+GENERATOR_BACKENDS = ("torch", "int8", "gguf")
+
+
+def model_id(model_name, backend="torch"):
+    """Cache key for a model; non-default backends produce slightly different outputs, so they get their own."""
+    return model_name if backend == "torch" else f"{model_name} ({backend})"
+
+
+def configure_threads(threads):
+    """Cap the intra-op thread pool torch uses for CPU inference."""
+    if threads:
+        import torch
+
+        torch.set_num_threads(threads)
+
+
+class OnnxEmbedder:
+    """ONNX Runtime version of a mean-pooling sentence-transformers model with the same encode contract.
+
+    Only onnxruntime and the tokenizer are needed at inference time; torch is
+    used once, by export_onnx, to produce the model file.
+    """
+
+    def __init__(self, model_dir, quantized=False, threads=None, max_length=256):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        model_file = "model_int8.onnx" if quantized else "model.onnx"
+        self.session = ort.InferenceSession(str(model_dir / model_file), options, providers=["CPUExecutionProvider"])
+        self.input_names = {node.name for node in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(str(model_dir))
+        self.max_length = max_length
+        revision_file = model_dir / "revision"
+        self.revision = revision_file.read_text(encoding="utf-8").strip() if revision_file.exists() else None
+
+    def get_sentence_embedding_dimension(self):
+        return self.session.get_outputs()[0].shape[-1]
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, normalize_embeddings=False, show_progress_bar=False):
+        single = isinstance(sentences, str)
+        sentences = [sentences] if single else list(sentences)
+        batches = []
+        for start in range(0, len(sentences), batch_size):
+            encoded = self.tokenizer(
+                sentences[start:start + batch_size], padding=True, truncation=True,
+                max_length=self.max_length, return_tensors="np",
+            )
+            feed = {name: encoded[name].astype(np.int64) for name in self.input_names if name in encoded}
+            hidden = self.session.run(None, feed)[0]
+            # Mean pooling over real (non-padding) tokens, as the sentence-transformers Pooling layer does
+            mask = encoded["attention_mask"][..., None].astype(np.float32)
+            batches.append((hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None))
+
+        dim = self.get_sentence_embedding_dimension()
+        embeddings = np.concatenate(batches) if batches else np.zeros((0, dim), dtype=np.float32)
+        if normalize_embeddings:
+            embeddings = embeddings / np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings[0] if single else embeddings
+
+
+def export_onnx(model_name, out_dir):
+    """Export the transformer behind a sentence-transformers model to ONNX, plus an int8-quantized copy."""
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).eval()
+    dummy = tokenizer(["Made in China"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in dummy]
+    axes = {0: "batch", 1: "sequence"}
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    torch.onnx.export(
+        model, tuple(dummy[name] for name in input_names), str(out_dir / "model.onnx"),
+        input_names=input_names, output_names=["last_hidden_state"],
+        dynamic_axes={name: axes for name in [*input_names, "last_hidden_state"]}, opset_version=14,
+    )
+    tokenizer.save_pretrained(str(out_dir))
+    (out_dir / "revision").write_text(getattr(model.config, "_commit_hash", None) or "", encoding="utf-8")
+    # Written last, so its presence marks a complete export
+    quantize_dynamic(str(out_dir / "model.onnx"), str(out_dir / "model_int8.onnx"), weight_type=QuantType.QInt8)
+
+
+def onnx_model_dir(model_name):
+    """Directory with the exported ONNX files for model_name, exporting them on first use."""
+    model_dir = cache_path("onnx", slugify(model_name), "model.onnx").parent
+    if not (model_dir / "model_int8.onnx").exists():
+        export_onnx(model_name, model_dir)
+    return model_dir
+
+
+def check_parity(reference, candidate, texts):
+    """Minimum cosine similarity between two embedders' normalized outputs for texts."""
+    expected = reference.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+    actual = candidate.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+    return float(np.min(np.sum(expected * actual, axis=1)))
+
+
+def model_revision(embedder):
+    """Hub commit hash of an embedder's loaded weights for cache keys, or "main" when unknown (e.g. a local path)."""
+    revision = getattr(embedder, "revision", None)
+    if revision is None:
+        try:
+            revision = embedder[0].auto_model.config._commit_hash
+        except (AttributeError, IndexError, KeyError, TypeError):
+            revision = None
+    return revision or "main"
+
+
+def load_embedder(model_name=DEFAULT_EMBEDDER, device=None, backend="torch", threads=None):
+    """Embedder for the chosen backend; "onnx"/"onnx-int8" export the model on first use and run it on CPU."""
+    if backend in ("onnx", "onnx-int8"):
+        return OnnxEmbedder(onnx_model_dir(model_name), quantized=backend == "onnx-int8", threads=threads)
+
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_name, device=device)
+
+
+class LlamaCppGenerator:
+    """llama.cpp runtime for a local GGUF model, called like a transformers text-generation pipeline.
+
+    Prompts run one after another (llama.cpp has no padded batching), and each
+    result is [{"generated_text": prompt + completion}] as the pipeline returns.
+    """
+
+    tokenizer = None
+
+    def __init__(self, model_path, threads=None, n_ctx=2048):
+        from llama_cpp import Llama
+
+        self.llm = Llama(model_path=model_path, n_ctx=n_ctx, n_threads=threads, verbose=False)
+
+    def __call__(self, prompts, batch_size=None, max_new_tokens=100, **gen_kwargs):
+        single = isinstance(prompts, str)
+        outputs = []
+        for prompt in [prompts] if single else prompts:
+            completion = self.llm(prompt, max_tokens=max_new_tokens)["choices"][0]["text"]
+            outputs.append([{"generated_text": prompt + completion}])
+        return outputs[0] if single else outputs
+
+
+def _int8_pipeline(model_name, task):
+    """CPU pipeline whose Linear layers are dynamically quantized to int8 (about 4x less weight memory).
+
+    Dynamic quantization needs float32 weights, so loading still peaks at the
+    full fp32 size (about 4 bytes per parameter, ~28 GB for a 7B model);
+    quantizing in place frees each fp32 Linear as its int8 copy replaces it.
+    """
+    import torch
+    from transformers import AutoModelForCausalLM, AutoModelForSeq2SeqLM, AutoTokenizer, pipeline
+
+    model_class = AutoModelForSeq2SeqLM if task == "text2text-generation" else AutoModelForCausalLM
+    model = model_class.from_pretrained(model_name, torch_dtype=torch.float32, low_cpu_mem_usage=True)
+    model = torch.ao.quantization.quantize_dynamic(model.eval(), {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return pipeline(task, model=model, tokenizer=AutoTokenizer.from_pretrained(model_name), device="cpu")
+
+
+def load_generator(model_name=DEFAULT_GENERATOR, device=None, task="text-generation", backend="torch", threads=None):
+    """Text generator for the chosen backend, all called like a Hugging Face pipeline.
+
+    "torch" is the plain pipeline, spread over available devices unless a
+    device is given. "int8" quantizes it for CPU-only machines. "gguf" runs a
+    local quantized GGUF file (model_name is its path) through llama.cpp.
+    """
+    if backend == "gguf":
+        return LlamaCppGenerator(model_name, threads)
+    if backend == "int8":
+        if device not in (None, "cpu"):
+            raise ValueError("The int8 generator backend only runs on CPU")
+        return _int8_pipeline(model_name, task)
+
+    from transformers import pipeline
+
+    if device is None:
+        return pipeline(task, model=model_name, device_map="auto")
+    return pipeline(task, model=model_name, device=device)
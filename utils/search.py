@@ -0,0 +1,100 @@
+import re
+import sqlite3
+import threading
+
+import numpy as np
+
+
+def fts_query(text):
+    """FTS5 MATCH expression requiring every word of text, each as a prefix."""
+    return " ".join(f'"{token}"*' for token in re.findall(r"\w+", text))
+
+
+class FullTextIndex:
+    """In-memory SQLite FTS5 index over text columns, with row positions as rowids."""
+
+    def __init__(self, df, columns):
+        self.columns = [column for column in columns if column in df.columns]
+        self.size = len(df)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.conn.execute(f"CREATE VIRTUAL TABLE docs USING fts5({', '.join(self.columns)})")
+        texts = [df[column].fillna("").astype(str).tolist() for column in self.columns]
+        placeholders = ", ".join("?" * (len(self.columns) + 1))
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO docs (rowid, {', '.join(self.columns)}) VALUES ({placeholders})",
+                zip(range(len(df)), *texts),
+            )
+
+    def search(self, text):
+        """Sorted row positions whose indexed columns contain every word of text."""
+        query = fts_query(text)
+        if not query:
+            return np.empty(0, dtype=np.int64)
+        with self._lock:
+            rows = self.conn.execute("SELECT rowid FROM docs WHERE docs MATCH ? ORDER BY rowid", (query,)).fetchall()
+        return np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+
+
+def _build_ann(vectors):
+    """HNSW index over normalized vectors (hnswlib, else faiss), or None if neither is installed."""
+    try:
+        import hnswlib
+
+        index = hnswlib.Index(space="ip", dim=vectors.shape[1])
+        index.init_index(max_elements=len(vectors), ef_construction=200, M=16)
+        index.add_items(vectors, np.arange(len(vectors)))
+        index.set_ef(64)
+        return "hnswlib", index
+    except ImportError:
+        pass
+    try:
+        import faiss
+
+        index = faiss.IndexHNSWFlat(vectors.shape[1], 16, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efSearch = 64
+        index.add(vectors)
+        return "faiss", index
+    except ImportError:
+        return None
+
+
+class SemanticIndex:
+    """Nearest-neighbour search over normalized product embeddings.
+
+    Catalogs up to exact_limit rows use an exact NumPy top-k; larger ones use
+    an HNSW index from hnswlib or faiss when available and fall back to the
+    exact scan otherwise.
+    """
+
+    def __init__(self, embeddings, exact_limit=50_000):
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.vectors = vectors / np.where(norms == 0, 1, norms)
+        self.ann = _build_ann(self.vectors) if len(self.vectors) > exact_limit else None
+
+    @property
+    def backend(self):
+        return self.ann[0] if self.ann else "exact"
+
+    def query(self, vector, k=10):
+        """Row positions and cosine scores of the k nearest rows, best first."""
+        vector = np.asarray(vector, dtype=np.float32).reshape(1, -1)
+        vector = vector / np.linalg.norm(vector)
+        k = min(k, len(self.vectors))
+        if k == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        if self.ann is None:
+            scores = self.vectors @ vector[0]
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return top, scores[top]
+
+        backend, index = self.ann
+        if backend == "hnswlib":
+            labels, distances = index.knn_query(vector, k=k)
+            return labels[0].astype(np.int64), 1 - distances[0]
+        scores, labels = index.search(vector, k)
+        return labels[0].astype(np.int64), scores[0]
@@ -0,0 +1,154 @@
+import ast
+import os
+from pathlib import Path
+
+import numpy as np
+
+
+class CsvSink:
+    """Appends result frames to a CSV file, writing the header only once.
+
+    With resume_at, the existing file is truncated to that byte offset (the
+    end of the last checkpointed chunk) and appended to without a new header.
+    """
+
+    def __init__(self, path, resume_at=None):
+        self.path = Path(path)
+        self.rows = 0
+        if resume_at is None:
+            self._file = open(self.path, "w", newline="", encoding="utf-8")
+            self._header = True
+        else:
+            with open(self.path, "r+b") as f:
+                f.truncate(resume_at)
+            self._file = open(self.path, "a", newline="", encoding="utf-8")
+            self._header = resume_at == 0
+
+    @property
+    def bytes_written(self):
+        return os.fstat(self._file.fileno()).st_size
+
+    def write(self, frame):
+        frame.to_csv(self._file, index=False, header=self._header)
+        self._file.flush()
+        self._header = False
+        self.rows += len(frame)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ParquetSink:
+    """Writes each result frame as a Parquet row group; the schema comes from the first frame."""
+
+    def __init__(self, path, resume_at=None):
+        import pyarrow  # noqa: F401  (fail early if Parquet support is missing)
+
+        if resume_at is not None:
+            raise ValueError("Resuming is only supported for CSV output; a Parquet file is unreadable until closed")
+
+        self.path = Path(path)
+        self.rows = 0
+        self._writer = None
+
+    def write(self, frame):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, table.schema)
+        else:
+            table = table.cast(self._writer.schema)
+        self._writer.write_table(table)
+        self.rows += len(frame)
+
+    @property
+    def bytes_written(self):
+        return self.path.stat().st_size if self.path.exists() else 0
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class NpySink:
+    """Appends float16 row blocks to a .npy file that stays loadable after every write.
+
+    The header is reserved at a fixed size and rewritten with the new row
+    count after each block, so np.load works on a partially written file.
+    With resume_rows, the file is truncated back to that many rows.
+    """
+
+    HEADER_SIZE = 128
+    dtype = np.dtype(np.float16)
+
+    def __init__(self, path, resume_rows=None):
+        self.path = Path(path)
+        self.rows = 0
+        self.dim = None
+        if not resume_rows:
+            self._file = open(self.path, "w+b")
+        else:
+            self._file = open(self.path, "r+b")
+            self._file.seek(10)
+            shape = ast.literal_eval(self._file.read(self.HEADER_SIZE - 10).decode("latin1"))["shape"]
+            self.dim = shape[1]
+            self.rows = resume_rows
+            self._file.truncate(self.HEADER_SIZE + resume_rows * self.dim * self.dtype.itemsize)
+            self._write_header()
+            self._file.flush()
+
+    def _write_header(self):
+        header = repr({"descr": self.dtype.str, "fortran_order": False, "shape": (self.rows, self.dim)})
+        header = header.ljust(self.HEADER_SIZE - 11) + "\n"
+        self._file.seek(0)
+        self._file.write(b"\x93NUMPY\x01\x00" + (self.HEADER_SIZE - 10).to_bytes(2, "little") + header.encode("latin1"))
+
+    def write(self, vectors):
+        vectors = np.ascontiguousarray(vectors, dtype=self.dtype)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"{self.path} holds {self.dim}-dimensional vectors; got {vectors.shape[1]}")
+        self._file.seek(0, os.SEEK_END)
+        if self._file.tell() < self.HEADER_SIZE:
+            self._file.write(b"\0" * self.HEADER_SIZE)
+        self._file.write(vectors.tobytes())
+        self.rows += len(vectors)
+        self._write_header()
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def embeddings_path(output_path):
+    """Where the product embeddings for a results file are stored."""
+    output_path = Path(output_path)
+    return output_path.with_name(f"{output_path.stem}.embeddings.npy")
+
+
+def open_sink(path, resume_at=None):
+    """CSV or Parquet sink chosen by the output file extension."""
+    if Path(path).suffix.lower() in (".parquet", ".pq"):
+        return ParquetSink(path, resume_at)
+    return CsvSink(path, resume_at)